@@ -3,24 +3,36 @@ LinkedIn Post Engager Tracker -> Clay Webhook
 
 Reads LinkedIn post URLs from a public Google Sheet, scrapes all engagers
 (reactions, comments, reposts), deduplicates against previously sent leads,
-enriches with LinkedIn profile data, sends to Clay webhook, and saves CSV.
+enriches with LinkedIn profile data, sends to Clay webhook, and saves CSV (gzipped).
 
 Requirements:
-    pip install datagen-python-sdk httpx tqdm
+    pip install datagen-python-sdk diskcache "httpx[http2]" orjson pybloom-live tqdm
     export DATAGEN_API_KEY=<your-key>
 """
 
+import atexit
 import csv
+import gzip
+import hashlib
 import io
-import json
+import math
 import os
 import re
+import threading
 import time
+from collections import defaultdict
+from collections.abc import Container
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, fields, replace
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from operator import attrgetter
 
+import diskcache
 import httpx
+import orjson
 from datagen_sdk import DatagenClient
+from pybloom_live import ScalableBloomFilter
 from tqdm import tqdm
 
 # ---------------------------------------------------------------------------
@@ -31,47 +43,160 @@ CLAY_WEBHOOK_URL = (
     "https://api.clay.com/v3/sources/webhook/"
     "pull-in-data-from-a-webhook-d523bf83-f52e-4214-be06-6a17302f3511"
 )
-SENT_LEADS_FILE = os.path.join(os.path.dirname(__file__), "sent_leads.json")
-CSV_OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "engagers.csv")
-MAX_ENRICHMENT_WORKERS = 5
-ACTIVITY_ID_RE = re.compile(r"(?:activity|ugcPost)[:\-](\d+)")
+SENT_LEADS_FILE = os.path.join(os.path.dirname(__file__), "sent_leads.txt")
+SENT_LEADS_BLOOM_FILE = os.path.join(os.path.dirname(__file__), "sent_leads.bloom")
+SENT_LEADS_META_FILE = os.path.join(os.path.dirname(__file__), "sent_leads_meta.json")
+LEGACY_SENT_LEADS_FILE = os.path.join(os.path.dirname(__file__), "sent_leads.json")
+CSV_OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "engagers.csv.gz")
+ENRICH_CACHE_DIR = os.path.join(os.path.dirname(__file__), "enrich_cache")
+ENRICH_CACHE_TTL = 7 * 86400  # seconds; how long a fetched profile is trusted
+
+
+def env_int(name: str, default: int) -> int:
+    """Read a count from the environment; must be a whole number >= 1."""
+    raw = os.getenv(name, str(default))
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise RuntimeError(f"{name} must be a whole number >= 1, got {raw!r}")
+    return value
+
+
+def env_rate(name: str, default: float) -> float:
+    """Read a per-second rate from the environment; must be a finite number > 0."""
+    raw = os.getenv(name, str(default))
+    try:
+        value = float(raw)
+    except ValueError:
+        value = 0.0
+    if not (math.isfinite(value) and value > 0):
+        raise RuntimeError(f"{name} must be a number > 0, got {raw!r}")
+    return value
+
+
+# Concurrency knobs; override via env to match the concurrency and rate
+# allowed for your DataGen API key. Invalid values fail at import, before any
+# API budget is spent.
+MAX_ENRICHMENT_WORKERS = env_int("ENRICH_WORKERS", 32)
+SCRAPE_WORKERS = env_int("SCRAPE_WORKERS", 8)
+DATAGEN_RATE_PER_SEC = env_rate("DATAGEN_RATE_PER_SEC", 5)
+DATAGEN_BURST = env_int("DATAGEN_BURST", 10)
+# LinkedIn post URL anywhere in the sheet export; group 1 is the activity ID.
+# Matches start at "linkedin.com" and may not run past the next one, so a long
+# cell of joined URLs is scanned in linear time instead of backtracking.
+LINKEDIN_POST_URL_RE = re.compile(
+    r'linkedin\.com(?:(?!linkedin\.com)[^\s",])*?(?:activity|ugcPost)[:\-](\d+)'
+)
+
+# Shared HTTP/2 client so the Sheet fetch and every Clay batch reuse warm
+# keep-alive connections instead of paying a TCP+TLS handshake per request.
+_HTTP = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=60,
+    follow_redirects=True,
+)
+atexit.register(_HTTP.close)
+
+# Profiles from get_linkedin_person_data keyed by authorUrl, so re-runs skip
+# enrichment calls for people we have already looked up.
+_ENRICH_CACHE = diskcache.Cache(ENRICH_CACHE_DIR)
+atexit.register(_ENRICH_CACHE.close)
 
 # ---------------------------------------------------------------------------
 # Google Sheet fetch (public CSV export, no MCP needed)
 # ---------------------------------------------------------------------------
 
-def fetch_post_urls(spreadsheet_id: str) -> list[str]:
-    """Fetch the public Google Sheet as CSV and extract all LinkedIn URLs."""
+def fetch_activity_ids(spreadsheet_id: str) -> list[str]:
+    """Fetch the public Google Sheet as CSV and extract the unique LinkedIn activity IDs."""
     export_url = (
         f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}"
         f"/export?format=csv&gid=0"
     )
-    resp = httpx.get(export_url, follow_redirects=True, timeout=30)
+    resp = _HTTP.get(export_url, timeout=30)
     resp.raise_for_status()
 
-    urls = []
-    reader = csv.reader(io.StringIO(resp.text))
-    for row in reader:
-        for cell in row:
-            cell = cell.strip()
-            if "linkedin.com" in cell and ACTIVITY_ID_RE.search(cell):
-                urls.append(cell)
-    return urls
+    # one regex sweep over the raw export; dict.fromkeys dedupes but keeps sheet order
+    return list(dict.fromkeys(LINKEDIN_POST_URL_RE.findall(resp.text)))
+
+
+# ---------------------------------------------------------------------------
+# Lead record
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Lead:
+    """One engager as it moves from scrape through dedup and enrichment to Clay/CSV.
+
+    Field order is the CSV column order.
+    """
+    authorId: str = ""
+    authorName: str = ""
+    authorUrl: str = ""
+    engagement_type: str = ""
+    reaction_type: str = ""
+    comment_text: str = ""
+    source_activity_id: str = ""
+    enriched: bool = False
+    firstName: str = ""
+    lastName: str = ""
+    headline: str = ""
+    location: str = ""
+    linkedInUrl: str = ""
+    summary: str = ""
+    followerCount: int = 0
+    openToWork: bool = False
+    currentTitle: str = ""
+    currentCompany: str = ""
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """Thread-safe token bucket: bursts up to `capacity` calls, refills at `rate` calls/sec."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
 
+    def acquire(self):
+        # Reserve a token under the lock, then sleep off any deficit outside it
+        # so waiting threads don't serialize each other.
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
 
-def extract_activity_id(url: str) -> str | None:
-    m = ACTIVITY_ID_RE.search(url)
-    return m.group(1) if m else None
+
+_LIMITER = RateLimiter(rate=DATAGEN_RATE_PER_SEC, capacity=DATAGEN_BURST)
+
+
+def call_tool(client: DatagenClient, tool_alias: str, params: dict):
+    """Execute a DataGen tool once a token is available from the shared limiter."""
+    _LIMITER.acquire()
+    return client.execute_tool(tool_alias, params)
 
 
 # ---------------------------------------------------------------------------
 # Scraping engagers
 # ---------------------------------------------------------------------------
 
-def scrape_reactions(client: DatagenClient, activity_id: str) -> list[dict]:
+def scrape_reactions(client: DatagenClient, activity_id: str, sent_ids: Container[str]) -> list[Lead]:
     """Get all reactions for a person post."""
     try:
-        result = client.execute_tool(
+        result = call_tool(
+            client,
             "get_linkedin_person_post_reactions",
             {"activity_id": activity_id},
         )
@@ -83,22 +208,25 @@ def scrape_reactions(client: DatagenClient, activity_id: str) -> list[dict]:
     out = []
     for r in reactions:
         author = r.get("author", {})
-        out.append({
-            "authorId": author.get("authorId", ""),
-            "authorName": author.get("authorName", ""),
-            "authorUrl": author.get("authorUrl", ""),
-            "engagement_type": "reaction",
-            "reaction_type": r.get("type", ""),
-            "comment_text": "",
-            "source_activity_id": activity_id,
-        })
+        author_id = author.get("authorId", "")
+        if author_id in sent_ids:
+            continue
+        out.append(Lead(
+            authorId=author_id,
+            authorName=author.get("authorName", ""),
+            authorUrl=author.get("authorUrl", ""),
+            engagement_type="reaction",
+            reaction_type=r.get("type", ""),
+            source_activity_id=activity_id,
+        ))
     return out
 
 
-def scrape_comments(client: DatagenClient, activity_id: str) -> list[dict]:
+def scrape_comments(client: DatagenClient, activity_id: str, sent_ids: Container[str]) -> list[Lead]:
     """Get all comments (auto-paginates up to 10 pages)."""
     try:
-        result = client.execute_tool(
+        result = call_tool(
+            client,
             "get_linkedin_person_post_comments",
             {"activity_id": activity_id},
         )
@@ -110,185 +238,334 @@ def scrape_comments(client: DatagenClient, activity_id: str) -> list[dict]:
     out = []
     for c in comments:
         author = c.get("author", {})
+        author_id = author.get("authorId", "")
+        if author_id in sent_ids:
+            continue
         identifier = author.get("authorPublicIdentifier", "")
         author_url = f"https://www.linkedin.com/in/{identifier}" if identifier else ""
-        out.append({
-            "authorId": author.get("authorId", ""),
-            "authorName": author.get("authorName", ""),
-            "authorUrl": author_url,
-            "engagement_type": "comment",
-            "reaction_type": "",
-            "comment_text": c.get("text", ""),
-            "source_activity_id": activity_id,
-        })
+        out.append(Lead(
+            authorId=author_id,
+            authorName=author.get("authorName", ""),
+            authorUrl=author_url,
+            engagement_type="comment",
+            comment_text=c.get("text", ""),
+            source_activity_id=activity_id,
+        ))
     return out
 
 
-def scrape_reposts(client: DatagenClient, activity_id: str) -> list[dict]:
-    """Get all reposts with manual pagination."""
-    all_reposts: list[dict] = []
-    page = 1
-    while True:
-        try:
-            result = client.execute_tool(
-                "get_linkedin_person_post_repost",
-                {"activity_id": activity_id, "page": page},
-            )
-        except Exception as e:
-            print(f"  [warn] reposts failed for {activity_id} page {page}: {e}")
-            break
-
-        if not isinstance(result, dict):
-            break
-        batch = result.get("reposts", [])
-        if not batch:
-            break
-
-        for rp in batch:
+REPOST_MAX_PAGES = 50
+REPOST_PAGE_WORKERS = 8
+
+
+def fetch_repost_page(client: DatagenClient, activity_id: str, page: int) -> dict | None:
+    try:
+        result = call_tool(
+            client,
+            "get_linkedin_person_post_repost",
+            {"activity_id": activity_id, "page": page},
+        )
+    except Exception as e:
+        print(f"  [warn] reposts failed for {activity_id} page {page}: {e}")
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def scrape_reposts(client: DatagenClient, activity_id: str, sent_ids: Container[str]) -> list[Lead]:
+    """Get all reposts; page 1 reveals the total, remaining pages are fetched in parallel."""
+    first = fetch_repost_page(client, activity_id, 1)
+    if not first or not first.get("reposts"):
+        return []
+
+    meta = first.get("metadata", {})
+    total = meta.get("total", 0)
+    per_page = meta.get("perPage", 10) or 10
+    num_pages = min(math.ceil(total / per_page), REPOST_MAX_PAGES)
+
+    pages = [first]
+    if num_pages > 1:
+        with ThreadPoolExecutor(max_workers=min(REPOST_PAGE_WORKERS, num_pages - 1)) as executor:
+            pages.extend(executor.map(
+                lambda page: fetch_repost_page(client, activity_id, page),
+                range(2, num_pages + 1),
+            ))
+
+    all_reposts: list[Lead] = []
+    for result in pages:
+        if not result:
+            continue
+        for rp in result.get("reposts", []):
             author = rp.get("author", {})
+            author_id = author.get("authorId", "")
+            if author_id in sent_ids:
+                continue
             identifier = author.get("authorPublicIdentifier", "")
             author_url = f"https://www.linkedin.com/in/{identifier}" if identifier else ""
-            all_reposts.append({
-                "authorId": author.get("authorId", ""),
-                "authorName": author.get("authorName", ""),
-                "authorUrl": author_url,
-                "engagement_type": "repost",
-                "reaction_type": "",
-                "comment_text": "",
-                "source_activity_id": activity_id,
-            })
-
-        meta = result.get("metadata", {})
-        total = meta.get("total", 0)
-        per_page = meta.get("perPage", 10)
-        if page * per_page >= total:
-            break
-        page += 1
-        if page > 50:
-            break
+            all_reposts.append(Lead(
+                authorId=author_id,
+                authorName=author.get("authorName", ""),
+                authorUrl=author_url,
+                engagement_type="repost",
+                source_activity_id=activity_id,
+            ))
 
     return all_reposts
 
 
-def scrape_all_engagers(client: DatagenClient, activity_ids: list[str]) -> list[dict]:
-    """Scrape reactions, comments, and reposts for every activity ID."""
-    all_engagers = []
-    for aid in tqdm(activity_ids, desc="Scraping posts", unit="post"):
-        all_engagers.extend(scrape_reactions(client, aid))
-        all_engagers.extend(scrape_comments(client, aid))
-        all_engagers.extend(scrape_reposts(client, aid))
-        time.sleep(1)  # rate-limit courtesy
-    return all_engagers
+def scrape_post(client: DatagenClient, activity_id: str, sent_ids: Container[str]) -> list[Lead]:
+    """Scrape reactions, comments, and reposts for one activity ID concurrently."""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        reactions = executor.submit(scrape_reactions, client, activity_id, sent_ids)
+        comments = executor.submit(scrape_comments, client, activity_id, sent_ids)
+        reposts = executor.submit(scrape_reposts, client, activity_id, sent_ids)
+        return reactions.result() + comments.result() + reposts.result()
 
 
-# ---------------------------------------------------------------------------
-# Deduplication
-# ---------------------------------------------------------------------------
+def scrape_all_engagers(
+    client: DatagenClient, activity_ids: list[str], sent_ids: Container[str]
+) -> list[Lead]:
+    """Scrape every activity ID in parallel; results keep the sheet's post order."""
+    if not activity_ids:
+        return []
 
-def load_sent_leads() -> set[str]:
-    if not os.path.exists(SENT_LEADS_FILE):
-        return set()
-    with open(SENT_LEADS_FILE, "r") as f:
-        data = json.load(f)
-    return set(data.get("sent_author_ids", []))
+    per_post: list[list[Lead]] = [[] for _ in activity_ids]
+    with ThreadPoolExecutor(max_workers=min(SCRAPE_WORKERS, len(activity_ids))) as executor:
+        futures = {
+            executor.submit(scrape_post, client, aid, sent_ids): idx
+            for idx, aid in enumerate(activity_ids)
+        }
+        with tqdm(total=len(futures), desc="Scraping posts", unit="post") as pbar:
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    per_post[idx] = future.result()
+                except Exception as e:
+                    print(f"  [error] scraping failed for {activity_ids[idx]}: {e}")
+                pbar.update(1)
 
+    return [eng for engagers in per_post for eng in engagers]
 
-def save_sent_leads(existing: set[str], new_ids: set[str]):
-    merged = sorted(existing | new_ids)
-    with open(SENT_LEADS_FILE, "w") as f:
-        json.dump({"sent_author_ids": merged, "last_updated": datetime.now(timezone.utc).isoformat()}, f, indent=2)
 
+# ---------------------------------------------------------------------------
+# Deduplication
+# ---------------------------------------------------------------------------
 
-def deduplicate(engagers: list[dict], sent_ids: set[str]) -> list[dict]:
-    """Deduplicate within batch by authorId, then filter out already-sent."""
-    seen: dict[str, dict] = {}
+class SentLeads:
+    """Membership index over previously sent authorIds.
+
+    A persisted Bloom filter answers the common "never sent" case without
+    building the exact ID set; filter hits are confirmed against the exact
+    log, which is loaded lazily on the first hit.
+    """
+
+    def __init__(self, bloom: ScalableBloomFilter, ids: set[str] | None = None):
+        self.bloom = bloom
+        self._ids = ids
+        self._lock = threading.Lock()  # scrape workers may hit the lazy load together
+
+    @classmethod
+    def from_ids(cls, ids: set[str]) -> "SentLeads":
+        bloom = ScalableBloomFilter(initial_capacity=100_000, error_rate=1e-4)
+        for author_id in ids:
+            bloom.add(author_id)
+        return cls(bloom, ids)
+
+    @property
+    def ids(self) -> set[str]:
+        with self._lock:
+            if self._ids is None:
+                self._ids = read_sent_log()
+            return self._ids
+
+    def __contains__(self, author_id: str) -> bool:
+        return author_id in self.bloom and author_id in self.ids
+
+    def __len__(self) -> int:
+        return len(self.bloom)
+
+    def add(self, author_id: str):
+        self.bloom.add(author_id)
+        if self._ids is not None:
+            self._ids.add(author_id)
+
+
+def read_sent_log() -> set[str]:
+    """Read sent authorIds from the append-only log (one ID per line)."""
+    if os.path.exists(SENT_LEADS_FILE):
+        with open(SENT_LEADS_FILE, "r") as f:
+            return set(f.read().splitlines())
+    if os.path.exists(LEGACY_SENT_LEADS_FILE):
+        with open(LEGACY_SENT_LEADS_FILE, "rb") as f:
+            return set(orjson.loads(f.read()).get("sent_author_ids", []))
+    return set()
+
+
+def read_sent_meta() -> dict:
+    try:
+        with open(SENT_LEADS_META_FILE, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def sent_log_digest() -> str:
+    """BLAKE2b of the sent-leads log; hashing bytes is far cheaper than building the ID set."""
+    h = hashlib.blake2b(digest_size=16)
+    if os.path.exists(SENT_LEADS_FILE):
+        with open(SENT_LEADS_FILE, "rb") as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def write_file_atomic(path: str, data: bytes):
+    """Write to a sibling temp file and rename it over `path`, so a crash never leaves a partial file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_sent_leads() -> SentLeads:
+    # The filter is only sound as a superset of the log, so it is trusted only if
+    # it was saved for a log with exactly the current contents. A crash mid-save
+    # or any hand edit of sent_leads.txt changes the digest and forces a rebuild.
+    if os.path.exists(SENT_LEADS_FILE) and os.path.exists(SENT_LEADS_BLOOM_FILE):
+        if read_sent_meta().get("log_digest") == sent_log_digest():
+            try:
+                with open(SENT_LEADS_BLOOM_FILE, "rb") as f:
+                    return SentLeads(ScalableBloomFilter.fromfile(f))
+            except Exception as e:
+                print(f"  [warn] {SENT_LEADS_BLOOM_FILE} unreadable, rebuilding from log: {e}")
+    # no usable filter (first run, legacy tracker, stale or corrupt filter): build it from the exact IDs
+    return SentLeads.from_ids(read_sent_log())
+
+
+def save_sent_leads(existing: SentLeads, new_ids: set[str]):
+    """Append only the IDs not already logged, refresh the Bloom filter, then stamp the meta file."""
+    if os.path.exists(SENT_LEADS_FILE):
+        fresh = {aid for aid in new_ids if aid not in existing}
+    else:
+        # first write: also carries over IDs loaded from the legacy sent_leads.json
+        fresh = existing.ids | new_ids
+    if fresh:
+        with open(SENT_LEADS_FILE, "ab+") as f:
+            # a hand-edited log may lack its trailing newline
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            f.write(("\n".join(fresh) + "\n").encode())
+    for aid in fresh:
+        existing.add(aid)
+
+    # filter first, meta last: until the meta records the new log digest, the
+    # next load treats the filter as stale and rebuilds it from the log
+    buf = io.BytesIO()
+    existing.bloom.tofile(buf)
+    write_file_atomic(SENT_LEADS_BLOOM_FILE, buf.getvalue())
+    write_file_atomic(SENT_LEADS_META_FILE, orjson.dumps(
+        {
+            "last_updated": datetime.now(timezone.utc).isoformat(),
+            "log_digest": sent_log_digest(),
+        },
+        option=orjson.OPT_INDENT_2,
+    ))
+
+
+def merge_engagements(group: list[Lead]) -> Lead:
+    """Fold all engagements by one author into the first one (which wins for other fields)."""
+    merged = group[0]
+    # combine engagement types, e.g. "reaction+comment"
+    merged.engagement_type = "+".join(dict.fromkeys(
+        e.engagement_type for e in group if e.engagement_type
+    ))
+    # keep authorUrl from whichever engagement type provides it
+    merged.authorUrl = next((e.authorUrl for e in group if e.authorUrl), "")
+    return merged
+
+
+def deduplicate(engagers: list[Lead]) -> list[Lead]:
+    """Merge engagements by authorId (already-sent authors were skipped while scraping)."""
+    groups: defaultdict[str, list[Lead]] = defaultdict(list)
     for eng in engagers:
-        aid = eng.get("authorId", "")
-        if not aid:
-            continue
-        if aid not in seen:
-            seen[aid] = eng
-        else:
-            # merge engagement types for the same person
-            existing = seen[aid]
-            existing_type = existing.get("engagement_type", "")
-            new_type = eng.get("engagement_type", "")
-            if new_type and new_type not in existing_type:
-                existing["engagement_type"] = f"{existing_type}+{new_type}"
-            # keep authorUrl if we get it from another engagement type
-            if not existing.get("authorUrl") and eng.get("authorUrl"):
-                existing["authorUrl"] = eng["authorUrl"]
-
-    unique = list(seen.values())
-    new_only = [e for e in unique if e["authorId"] not in sent_ids]
-    print(f"  Total engagers: {len(engagers)}")
-    print(f"  Unique engagers: {len(unique)}")
-    print(f"  Previously sent: {len(unique) - len(new_only)}")
-    print(f"  New leads: {len(new_only)}")
-    return new_only
+        if eng.authorId:
+            groups[eng.authorId].append(eng)
+
+    unique = [merge_engagements(group) for group in groups.values()]
+    print(f"  New engagements: {len(engagers)}")
+    print(f"  New leads: {len(unique)}")
+    return unique
 
 
 # ---------------------------------------------------------------------------
 # Enrichment
 # ---------------------------------------------------------------------------
 
-def enrich_single(client: DatagenClient, engager: dict) -> dict:
-    """Enrich one engager with full LinkedIn profile data via get_linkedin_person_data."""
-    author_url = engager.get("authorUrl", "")
-    author_name = engager.get("authorName", "")
+def profile_fields(profile: dict) -> dict:
+    """Map a get_linkedin_person_data profile onto Lead fields; raises if the profile is malformed."""
+    current = ((profile.get("positions") or {}).get("positionHistory") or [{}])[0]
+    return {
+        "enriched": True,
+        "firstName": profile.get("firstName", ""),
+        "lastName": profile.get("lastName", ""),
+        "headline": profile.get("headline", ""),
+        "location": profile.get("location", ""),
+        "linkedInUrl": profile.get("linkedInUrl", ""),
+        "summary": profile.get("summary", ""),
+        "followerCount": profile.get("followerCount", 0),
+        "openToWork": profile.get("openToWork", False),
+        "currentTitle": current.get("title", ""),
+        "currentCompany": current.get("companyName", ""),
+    }
+
+
+def enrich_single(client: DatagenClient, lead: Lead) -> Lead:
+    """Return the lead with its LinkedIn profile fields filled in via get_linkedin_person_data."""
+    author_url = lead.authorUrl
     profile = None
+    cached = False
 
     if author_url and "/in/" in author_url:
-        try:
-            result = client.execute_tool(
-                "get_linkedin_person_data",
-                {"linkedin_url": author_url},
-            )
-            if isinstance(result, dict):
-                profile = result.get("person", result)
-        except Exception as e:
-            print(f"    [warn] enrich failed for {author_name}: {e}")
+        profile = _ENRICH_CACHE.get(author_url)
+        cached = profile is not None
+        if not cached:
+            try:
+                result = call_tool(
+                    client,
+                    "get_linkedin_person_data",
+                    {"linkedin_url": author_url},
+                )
+                if isinstance(result, dict):
+                    profile = result.get("person", result)
+            except Exception as e:
+                print(f"    [warn] enrich failed for {lead.authorName}: {e}")
     else:
-        print(f"    [skip] no profile URL for {author_name} -- cannot enrich")
-
-    enriched = {
-        "authorId": engager.get("authorId", ""),
-        "authorName": author_name,
-        "authorUrl": author_url,
-        "engagement_type": engager.get("engagement_type", ""),
-        "reaction_type": engager.get("reaction_type", ""),
-        "comment_text": engager.get("comment_text", ""),
-        "source_activity_id": engager.get("source_activity_id", ""),
-        "enriched": bool(profile),
-    }
-
-    if profile:
-        enriched.update({
-            "firstName": profile.get("firstName", ""),
-            "lastName": profile.get("lastName", ""),
-            "headline": profile.get("headline", ""),
-            "location": profile.get("location", ""),
-            "linkedInUrl": profile.get("linkedInUrl", ""),
-            "summary": profile.get("summary", ""),
-            "followerCount": profile.get("followerCount", 0),
-            "openToWork": profile.get("openToWork", False),
-            "currentTitle": "",
-            "currentCompany": "",
-        })
-        positions = profile.get("positions", {})
-        history = positions.get("positionHistory", [])
-        if history:
-            enriched["currentTitle"] = history[0].get("title", "")
-            enriched["currentCompany"] = history[0].get("companyName", "")
+        print(f"    [skip] no profile URL for {lead.authorName} -- cannot enrich")
 
-    return enriched
+    if not profile:
+        return lead
+    # map the whole profile before touching the lead, so a malformed one can't leave it half-filled
+    try:
+        values = profile_fields(profile)
+    except Exception as e:
+        print(f"    [warn] malformed profile for {lead.authorName}: {e}")
+        _ENRICH_CACHE.delete(author_url)  # don't keep failing on a bad entry until it expires
+        return lead
+    # only cache profiles that parse, so a bad response is retried on the next run
+    if not cached:
+        _ENRICH_CACHE.set(author_url, profile, expire=ENRICH_CACHE_TTL)
+    return replace(lead, **values)
 
 
-def enrich_leads(client: DatagenClient, new_engagers: list[dict]) -> list[dict]:
+def enrich_leads(client: DatagenClient, new_engagers: list[Lead]) -> list[Lead]:
     """Enrich all new engagers in parallel using ThreadPoolExecutor."""
     if not new_engagers:
         return []
 
+    # DataGen has no bulk person-lookup tool and execute_tool is synchronous, so
+    # enrichment stays one call per lead on a thread pool. Throughput is capped by
+    # the shared rate limiter; the pool only needs enough threads to hide latency.
     enriched = []
     with ThreadPoolExecutor(max_workers=MAX_ENRICHMENT_WORKERS) as executor:
         futures = {
@@ -301,8 +578,8 @@ def enrich_leads(client: DatagenClient, new_engagers: list[dict]) -> list[dict]:
                     enriched.append(future.result())
                 except Exception as e:
                     original = futures[future]
-                    print(f"  [error] enrichment failed for {original.get('authorName')}: {e}")
-                    original["enriched"] = False
+                    print(f"  [error] enrichment failed for {original.authorName}: {e}")
+                    original.enriched = False
                     enriched.append(original)
                 pbar.update(1)
 
@@ -314,47 +591,99 @@ def enrich_leads(client: DatagenClient, new_engagers: list[dict]) -> list[dict]:
 # ---------------------------------------------------------------------------
 
 CLAY_BATCH_SIZE = 50
+CLAY_BATCH_WORKERS = env_int("CLAY_BATCH_WORKERS", 16)
+CLAY_MAX_ATTEMPTS = 3
+# The webhook is not idempotent, so a resend can duplicate rows in the Clay
+# table. Retry only when Clay answered and refused the batch itself (429, 500,
+# 503) or the request never left (connect/pool failures). Gateway errors
+# (502/504), read timeouts and dropped responses are not retried: the upstream
+# may already have stored the batch.
+CLAY_RETRY_STATUSES = {429, 500, 503}
+CLAY_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+CLAY_MAX_RETRY_AFTER = 60  # seconds; cap on a server-requested wait
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+def retry_after_seconds(resp: httpx.Response) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date), capped at CLAY_MAX_RETRY_AFTER."""
+    value = resp.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(delay, 0), CLAY_MAX_RETRY_AFTER)
+
+
+def post_clay_batch(webhook_url: str, batch: list[Lead]) -> httpx.Response:
+    """POST one batch, retrying 429/500/503 and connection failures with exponential backoff (1s, 2s, ...).
+
+    A 429 waits for the server's Retry-After instead when it sends one.
+    """
+    # orjson serializes the Lead dataclasses natively; encode once, reuse across retries
+    payload = orjson.dumps(batch)
+    for attempt in range(CLAY_MAX_ATTEMPTS):
+        last = attempt == CLAY_MAX_ATTEMPTS - 1
+        delay = 2 ** attempt
+        try:
+            resp = _HTTP.post(webhook_url, content=payload, headers=JSON_HEADERS)
+        except CLAY_RETRY_ERRORS:
+            if last:
+                raise
+        else:
+            if resp.status_code not in CLAY_RETRY_STATUSES or last:
+                return resp
+            if resp.status_code == 429 and (retry_after := retry_after_seconds(resp)) is not None:
+                delay = retry_after
+        time.sleep(delay)
 
 
-def send_to_clay(leads: list[dict], webhook_url: str):
+def send_to_clay(leads: list[Lead], webhook_url: str):
     if not leads:
         print("No leads to send to Clay.")
         return
     batches = [leads[i:i + CLAY_BATCH_SIZE] for i in range(0, len(leads), CLAY_BATCH_SIZE)]
     print(f"Sending {len(leads)} leads to Clay in {len(batches)} batches ...")
-    for idx, batch in enumerate(tqdm(batches, desc="Clay batches", unit="batch"), 1):
-        try:
-            resp = httpx.post(webhook_url, json=batch, timeout=60)
-            if resp.status_code >= 400:
-                print(f"  Batch {idx} failed ({resp.status_code}): {resp.text[:300]}")
-            else:
-                print(f"  Batch {idx}: {resp.status_code} ({len(batch)} leads)")
-        except Exception as e:
-            print(f"  [error] Batch {idx} failed: {e}")
+    with ThreadPoolExecutor(max_workers=min(CLAY_BATCH_WORKERS, len(batches))) as executor:
+        futures = {
+            executor.submit(post_clay_batch, webhook_url, batch): (idx, batch)
+            for idx, batch in enumerate(batches, 1)
+        }
+        with tqdm(total=len(futures), desc="Clay batches", unit="batch") as pbar:
+            for future in as_completed(futures):
+                idx, batch = futures[future]
+                try:
+                    resp = future.result()
+                    if resp.status_code >= 400:
+                        print(f"  Batch {idx} failed ({resp.status_code}): {resp.text[:300]}")
+                    else:
+                        print(f"  Batch {idx}: {resp.status_code} ({len(batch)} leads)")
+                except Exception as e:
+                    print(f"  [error] Batch {idx} failed: {e}")
+                pbar.update(1)
 
 
 # ---------------------------------------------------------------------------
 # CSV output
 # ---------------------------------------------------------------------------
 
-CSV_COLUMNS = [
-    "authorId", "authorName", "authorUrl",
-    "engagement_type", "reaction_type", "comment_text",
-    "source_activity_id", "enriched",
-    "firstName", "lastName", "headline", "location",
-    "linkedInUrl", "summary", "followerCount", "openToWork",
-    "currentTitle", "currentCompany",
-]
+CSV_COLUMNS = [f.name for f in fields(Lead)]
 
 
-def save_csv(leads: list[dict], path: str):
+def save_csv(leads: list[Lead], path: str):
     if not leads:
         print("No leads to write to CSV.")
         return
-    with open(path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
-        writer.writeheader()
-        writer.writerows(leads)
+    row = attrgetter(*CSV_COLUMNS)
+    # level 1 is nearly free CPU-wise and still shrinks the repetitive rows several-fold
+    with gzip.open(path, "wt", newline="", compresslevel=1) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        writer.writerows(map(row, leads))
     print(f"CSV saved to {path} ({len(leads)} rows)")
 
 
@@ -368,52 +697,43 @@ def main(limit: int = 0):
 
     client = DatagenClient()
 
-    # 1. Fetch post URLs from Google Sheet
+    # 1. Fetch unique activity IDs from Google Sheet
     print("Fetching Google Sheet ...")
-    all_urls = fetch_post_urls(SPREADSHEET_ID)
-    print(f"  Found {len(all_urls)} LinkedIn URLs")
-
-    # 2. Extract unique activity IDs
-    seen_aids = set()
-    activity_ids = []
-    for url in all_urls:
-        aid = extract_activity_id(url)
-        if aid and aid not in seen_aids:
-            seen_aids.add(aid)
-            activity_ids.append(aid)
+    activity_ids = fetch_activity_ids(SPREADSHEET_ID)
     print(f"  Unique activity IDs: {len(activity_ids)}")
 
     if limit > 0:
         activity_ids = activity_ids[:limit]
         print(f"  Limiting to first {limit} posts")
 
-    # 3. Scrape engagers from all posts
-    all_engagers = scrape_all_engagers(client, activity_ids)
-
-    # 4. Deduplicate
+    # 2. Scrape engagers from all posts, skipping previously sent authors
     sent_ids = load_sent_leads()
-    print(f"Deduplicating (previously sent: {len(sent_ids)}) ...")
-    new_engagers = deduplicate(all_engagers, sent_ids)
+    print(f"Previously sent leads: {len(sent_ids)}")
+    all_engagers = scrape_all_engagers(client, activity_ids, sent_ids)
+
+    # 3. Deduplicate
+    print("Deduplicating ...")
+    new_engagers = deduplicate(all_engagers)
 
-    # 5. Enrich new leads
+    # 4. Enrich new leads
     enriched = enrich_leads(client, new_engagers)
 
-    # 6. Send to Clay
+    # 5. Send to Clay
     send_to_clay(enriched, CLAY_WEBHOOK_URL)
 
-    # 7. Update sent-leads tracker
-    new_ids = {e["authorId"] for e in enriched if e.get("authorId")}
+    # 6. Update sent-leads tracker
+    new_ids = {e.authorId for e in enriched if e.authorId}
     if new_ids:
         save_sent_leads(sent_ids, new_ids)
         print(f"Updated {SENT_LEADS_FILE} (+{len(new_ids)} IDs)")
 
-    # 8. Save CSV of all unique engagers
+    # 7. Save CSV of all unique engagers
     save_csv(enriched, CSV_OUTPUT_FILE)
 
     # Summary
     print("\n--- Summary ---")
     print(f"Posts processed:     {len(activity_ids)}")
-    print(f"Total engagers:      {len(all_engagers)}")
+    print(f"New engagements:     {len(all_engagers)}")
     print(f"New leads enriched:  {len(enriched)}")
     print(f"Sent to Clay:        {len(enriched)}")
     print(f"CSV:                 {CSV_OUTPUT_FILE}")